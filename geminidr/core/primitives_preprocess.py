@@ -108,7 +108,17 @@ class Preprocess(PrimitivesBASE):
             for ext, gain in zip(ad, gain_list):
                 extver = ext.hdr['EXTVER']
                 log.stdinfo("  gain for EXTVER {} = {}".format(extver, gain))
-                ext.multiply(gain)
+                # Floating-point data can be scaled in place, avoiding new
+                # SCI and VAR arrays; integer data needs to be upcast. The
+                # VAR array is modified through a local name because
+                # assigning to ext.variance makes a copy
+                if ext.data.dtype.kind == 'f':
+                    ext.data *= gain
+                    variance = ext.variance
+                    if variance is not None:
+                        variance *= gain * gain
+                else:
+                    ext.multiply(gain)
 
             # Update the headers of the AstroData Object. The pixel data now
             # has units of electrons so update the physical units keyword.
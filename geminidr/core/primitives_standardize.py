@@ -89,20 +89,31 @@ class Standardize(PrimitivesBASE):
                 final_user = gt.clip_auxiliary_data(ad, aux=user,
                                         aux_type='bpm', return_dtype=DQ.datatype)
 
-            for ext, static_ext, user_ext in zip(ad, final_static, final_user):
+            # Evaluate the level descriptors once for the whole AD, rather
+            # than once per extension
+            for (ext, static_ext, user_ext, non_linear_level,
+                 saturation_level) in zip(ad, final_static, final_user,
+                                          ad.non_linear_level(),
+                                          ad.saturation_level()):
                 extver = ext.hdr['EXTVER']
                 if ext.mask is not None:
                     log.warning('A mask already exists in extver {}'.
                                 format(extver))
                     continue
 
-                non_linear_level = ext.non_linear_level()
-                saturation_level = ext.saturation_level()
-
-                # Need to create the array first for 3D raw F2 data, with 2D BPM
-                ext.mask = np.zeros_like(ext.data, dtype=DQ.datatype)
-                if static_ext is not None:
-                    ext.mask |= static_ext.data
+                # The clipped BPM is a private copy, so it can become the
+                # mask directly if it matches, unless it is a view into a
+                # larger (unclipped) BPM array, which would then be kept
+                # alive. Otherwise need to create the array first for 3D
+                # raw F2 data, with 2D BPM
+                if (static_ext is not None and
+                        static_ext.data.base is None and
+                        static_ext.data.shape == ext.data.shape):
+                    ext.mask = static_ext.data
+                else:
+                    ext.mask = np.zeros_like(ext.data, dtype=DQ.datatype)
+                    if static_ext is not None:
+                        ext.mask |= static_ext.data
                 if user_ext is not None:
                     ext.mask |= user_ext.data
 
@@ -110,8 +121,7 @@ class Standardize(PrimitivesBASE):
                     log.fullinfo('Flagging saturated pixels in {}:{} '
                                  'above level {:.2f}'.
                                  format(ad.filename, extver, saturation_level))
-                    ext.mask |= np.where(ext.data >= saturation_level,
-                                         DQ.saturated, 0).astype(DQ.datatype)
+                    ext.mask[ext.data >= saturation_level] |= DQ.saturated
 
                 if non_linear_level:
                     if saturation_level:
@@ -120,9 +130,8 @@ class Standardize(PrimitivesBASE):
                                          'above level {:.2f}'.
                                          format(ad.filename, extver,
                                                 non_linear_level))
-                            ext.mask |= np.where((ext.data >= non_linear_level) &
-                                                 (ext.data < saturation_level),
-                                                 DQ.non_linear, 0).astype(DQ.datatype)
+                            ext.mask[(ext.data >= non_linear_level) &
+                                     (ext.data < saturation_level)] |= DQ.non_linear
                             # Readout modes of IR detectors can result in
                             # saturated pixels having values below the
                             # saturation level. Flag those. Assume we have an
@@ -137,16 +146,14 @@ class Standardize(PrimitivesBASE):
                             region_sizes = measurements.labeled_comprehension(
                                 ext.data, regions, np.arange(1, nregions+1),
                                 len, int, 0)
-                            # First, assume all regions are saturated, and
-                            # remove any very large ones. This is much faster
-                            # than progressively adding each region to DQ
-                            hidden_saturation_array = np.where(regions > 0,
-                                                    4, 0).astype(DQ.datatype)
-                            for region in range(1, nregions+1):
-                                # Limit of 10000 pixels for a hole is a bit arbitrary
-                                if region_sizes[region-1] > 10000:
-                                    hidden_saturation_array[regions==region] = 0
-                            ext.mask |= hidden_saturation_array
+                            # Build a lookup table of the DQ value for each
+                            # region label (0 is the unlabelled background)
+                            # and flag every region in one pass, rather than
+                            # comparing the whole label array per region.
+                            # Limit of 10000 pixels for a hole is a bit arbitrary
+                            region_flags = np.zeros(nregions+1, dtype=DQ.datatype)
+                            region_flags[1:][region_sizes <= 10000] = DQ.saturated
+                            ext.mask |= region_flags[regions]
 
                         elif saturation_level < non_linear_level:
                             log.warning('{}:{} has saturation level less than '
@@ -161,8 +168,7 @@ class Standardize(PrimitivesBASE):
                                      'above level {:.2f}'.
                                      format(ad.filename, extver,
                                             non_linear_level))
-                        ext.mask |= np.where(ext.data >= non_linear_level,
-                                             DQ.non_linear, 0).astype(DQ.datatype)
+                        ext.mask[ext.data >= non_linear_level] |= DQ.non_linear
 
 
         # Handle latency if reqested
@@ -483,15 +489,25 @@ class Standardize(PrimitivesBASE):
                 log.warning("Poisson noise already added for "
                             "{}:{}".format(ad.filename, extver))
                 continue
-            var_array = np.where(ext.data > 0, ext.data, 0).astype(dtype)
+            # Clip negative (and NaN) pixels to zero, writing straight into
+            # the output array rather than via np.where and astype copies
+            var_array = np.empty(ext.data.shape, dtype=dtype)
+            np.fmax(ext.data, 0, out=var_array)
+            # Combine the coadds and gain corrections into a single factor
+            # so the array is only rescaled once
+            scale = 1.0
             if not ext.is_coadds_summed():
-                var_array /= ext.coadds()
+                scale /= ext.coadds()
             if ext.is_in_adu():
-                var_array /= ext.gain()
+                scale /= gain
+            if scale != 1.0:
+                var_array *= scale
             if ext.variance is None:
                 ext.variance = var_array
             else:
-                ext.variance += var_array
+                # Add in place; assigning to ext.variance would copy it
+                variance = ext.variance
+                variance += var_array
             varnoise = ext.hdr.get('VARNOISE')
             if varnoise is None:
                 ext.hdr.set('VARNOISE', 'Poisson',
@@ -529,12 +545,14 @@ class Standardize(PrimitivesBASE):
                              format(ad.filename, extver, read_noise))
             if ext.is_in_adu():
                 read_noise /= gain
-            var_array = np.full_like(ext.data, read_noise * read_noise,
-                                     dtype=dtype)
+            # The read noise variance is constant, so only build a full
+            # array if there is no existing variance to add it to
             if ext.variance is None:
-                ext.variance = var_array
+                ext.variance = np.full_like(ext.data, read_noise * read_noise,
+                                            dtype=dtype)
             else:
-                ext.variance += var_array
+                variance = ext.variance
+                variance += read_noise * read_noise
             varnoise = ext.hdr.get('VARNOISE')
             if varnoise is None:
                 ext.hdr.set('VARNOISE', 'read',
@@ -569,7 +587,7 @@ class Standardize(PrimitivesBASE):
                 bpm = bpm_dict[key]
             except KeyError:
                 log.warning('No static BPM found for {}'.format(ad.filename))
-        except:
+        except (ImportError, AttributeError, TypeError):
             log.warning('No static BPMs defined')
 
         if bpm is not None:
@@ -603,7 +621,7 @@ class Standardize(PrimitivesBASE):
         try:
             masks = import_module('.maskdb', self.inst_lookups)
             illum_dict = getattr(masks, 'illumMask_dict')
-        except:
+        except (ImportError, AttributeError, TypeError):
             log.fullinfo('No illumination mask dict for {}'.
                          format(ad.filename))
             return None
@@ -449,6 +449,8 @@ class QA(PrimitivesBASE):
         for ad in adinputs:
             iq_overlays = []
             measure_iq = True
+            # The tags are recomputed on every access, so only do it once
+            tags = ad.tags
 
             # We may need to tile the image (and OBJCATs) so make an
             # adiq object for such purposes
@@ -497,7 +499,7 @@ class QA(PrimitivesBASE):
                 adiq = ad
 
             # Check that the data is not an image with non-square binning
-            if 'IMAGE' in ad.tags:
+            if 'IMAGE' in tags:
                 xbin = ad.detector_x_bin()
                 ybin = ad.detector_y_bin()
                 if xbin != ybin:
@@ -507,8 +509,8 @@ class QA(PrimitivesBASE):
 
             # Get suitable FWHM-measurement sources; through-slit imaging
             # uses the spectroscopic method in case the slit width < seeing
-            if {'IMAGE', 'SPECT'} & ad.tags:
-                image_like = 'IMAGE' in ad.tags and not hasattr(ad, 'MDF')
+            if {'IMAGE', 'SPECT'} & tags:
+                image_like = 'IMAGE' in tags and not hasattr(ad, 'MDF')
                 good_source = gt.clip_sources(adiq) if image_like else \
                     gt.fit_continuum(adiq)
             else:
@@ -590,7 +592,7 @@ class QA(PrimitivesBASE):
                     if not is_ao:
                         iq = fwhm
                     else:
-                        if strehl.value is not None and {'GSAOI', 'IMAGE'}.issubset(ad.tags):
+                        if strehl.value is not None and {'GSAOI', 'IMAGE'}.issubset(tags):
                             iq = _gsaoi_iq_estimate(ad, fwhm, strehl)
                         else:
                             iq = Measurement(ao_seeing, None, 0)
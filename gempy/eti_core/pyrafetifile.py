@@ -1,8 +1,15 @@
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
 from .etifile import ETIFile
 
 from ..utils import logutils
 log = logutils.get_logger(__name__)
 
+# Maximum number of threads used to write temporary input files
+MAX_WRITE_THREADS = 8
+
 class PyrafETIFile(ETIFile):
     """This class coordinates the ETI files as it pertains to Pyraf
     tasks in general.
@@ -29,6 +36,43 @@ class PyrafETIFile(ETIFile):
     def prepare(self):
         log.debug("PyrafETIFile prepare()")
 
+    def _remove_files(self, filenames):
+        """
+        Deletes temporary files from disk. Files that are already missing
+        are skipped so a partial cleanup can always be completed.
+        """
+        verbose = log.isEnabledFor(logutils.ll['FULLINFO'])
+        for a_file in filenames:
+            try:
+                os.remove(a_file)
+            except FileNotFoundError:
+                continue
+            if verbose:
+                log.fullinfo("%s was deleted from disk" % a_file)
+
+    def _write_ads(self, ad_files, atlist=None):
+        """
+        Writes a list of (AstroData, filename) pairs to disk. The files are
+        independent, so they are written concurrently. If atlist is given,
+        an @-list of the filenames is written at the same time.
+        """
+        with ThreadPoolExecutor(max_workers=max(min(MAX_WRITE_THREADS, len(ad_files)), 1)) as executor:
+            futures = [executor.submit(ad.write, filename, overwrite=True)
+                       for ad, filename in ad_files]
+            if atlist:
+                futures.append(executor.submit(
+                    self._write_atlist, atlist,
+                    [filename for _, filename in ad_files]))
+            # Collect the results so any exception is raised here
+            for future in futures:
+                future.result()
+
+    def _write_atlist(self, atlist, filenames):
+        """Writes an IRAF @-list of the given filenames in a single call"""
+        data = "".join(fil + "\n" for fil in filenames).encode()
+        with open(atlist, "wb") as fhdl:
+            fhdl.write(data)
+
     def recover(self):
         log.debug("PyrafETIFile recover(): pass")
 
@@ -67,9 +67,9 @@ class GemcombineETI(PyrafETI):
         # (but this time with Stderr and Stdout)
         try:
             gemini.gemcombine(**xcldict)
-        except:
+        except Exception as err:
             # catch hard crash of the primitive
-            raise RuntimeError("The IRAF task gemcombine failed")
+            raise RuntimeError("The IRAF task gemcombine failed") from err
         if gemini.gemcombine.status:
             # catch graceful exit on error
             raise RuntimeError("The IRAF task gemcombine failed")
@@ -21,6 +21,7 @@ class GemcombineFile(PyrafETIFile):
     diskinlist = None
     pid_str = None
     pid_task = None
+    prefix = None
     adinput = None
 
     def __init__(self, inputs=None, params=None):
@@ -34,10 +35,11 @@ class GemcombineFile(PyrafETIFile):
         self.taskname = "gemcombine"
         self.pid_str = str(os.getpid())
         self.pid_task = self.pid_str + self.taskname
+        self.prefix = "tmp" + self.pid_task
         self.adinput = inputs
 
     def get_prefix(self):
-        return "tmp" + self.pid_task
+        return self.prefix
 
 class InAtList(GemcombineFile):
     inputs = None
@@ -56,6 +58,11 @@ class InAtList(GemcombineFile):
 
     def prepare(self):
         log.debug("InAtList prepare()")
+        # Filenames are assigned serially so they are deterministic; the
+        # (independent) disk writes, including the @-list, are then done
+        # together
+        self.atlist = "tmpImageList" + self.pid_task
+        ad_files = []
         for ad in self.adinput:
             ad = gemini_tools.obsmode_add(ad)
             origname = ad.filename
@@ -63,24 +70,16 @@ class InAtList(GemcombineFile):
             self.diskinlist.append(ad.filename)
             log.fullinfo("Temporary image (%s) on disk for the IRAF task %s" % \
                           (ad.filename, self.taskname))
-            ad.write(ad.filename, overwrite=True)
+            ad_files.append((ad, ad.filename))
             ad.filename = origname
-        self.atlist = "tmpImageList" + self.pid_task
-        fhdl = open(self.atlist, "w")
-        for fil in self.diskinlist:
-            fhdl.writelines(fil + "\n")
-        fhdl.close()
+        self._write_ads(ad_files, atlist=self.atlist)
         log.fullinfo("Temporary list (%s) on disk for the IRAF task %s" % \
                       (self.atlist, self.taskname))
         self.filedict.update({"input": "@" + self.atlist})
 
     def clean(self):
         log.debug("InAtList clean()")
-        for a_file in self.diskinlist:
-            os.remove(a_file)
-            log.fullinfo("%s was deleted from disk" % a_file)
-        os.remove(self.atlist)
-        log.fullinfo("%s was deleted from disk" % self.atlist)
+        self._remove_files(self.diskinlist + [self.atlist])
 
 class OutFile(GemcombineFile):
     inputs = None
@@ -122,13 +121,13 @@ class OutFile(GemcombineFile):
 
     def clean(self):
         log.debug("Outfile clean()")
-        os.remove(self.tmp_name)
-        log.fullinfo(self.tmp_name + " was deleted from disk")
+        self._remove_files([self.tmp_name])
 
 
 class LogFile(GemcombineFile):
     inputs = None
     params = None
+    tmplog_name = None
     def __init__(self, inputs=None, params=None):
         """
         :param rc: Used to store reduction information
@@ -139,6 +138,15 @@ class LogFile(GemcombineFile):
 
     def prepare(self):
         log.debug("LogFile prepare()")
-        tmplog = tempfile.NamedTemporaryFile()
-        self.filedict.update({"logfile": tmplog.name})
+        # The file must still exist when IRAF opens it, so don't use a
+        # NamedTemporaryFile (which is deleted as soon as it is closed)
+        fd, self.tmplog_name = tempfile.mkstemp(prefix=self.taskname + "_",
+                                                suffix=".log")
+        os.close(fd)
+        self.filedict.update({"logfile": self.tmplog_name})
+
+    def clean(self):
+        log.debug("LogFile clean()")
+        if self.tmplog_name:
+            self._remove_files([self.tmplog_name])
 
@@ -71,9 +71,9 @@ class GmosaicETI(PyrafETI):
         #pprint(xcldict)
         try:
             gemini.gmos.gmosaic(**xcldict)
-        except:
+        except Exception as err:
             # catch hard crash
-            raise RuntimeError("The IRAF task gmos.gmosaic failed")
+            raise RuntimeError("The IRAF task gmos.gmosaic failed") from err
         if gemini.gmos.gmosaic.status:
             # catch graceful exit upon error
             raise RuntimeError("The IRAF task gmos.gmosaic failed")
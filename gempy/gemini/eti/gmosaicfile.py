@@ -22,6 +22,7 @@ class GmosaicFile(PyrafETIFile):
     diskoutlist = None
     pid_str = None
     pid_task = None
+    prefix = None
     adinput = None
     ad = None
     def __init__(self, inputs=None, params=None, ad=None):
@@ -36,13 +37,14 @@ class GmosaicFile(PyrafETIFile):
         self.taskname = "gmosaic"
         self.pid_str = str(os.getpid())
         self.pid_task = self.pid_str + self.taskname
+        self.prefix = "tmp" + self.pid_task
         if ad:
             self.adinput = [ad]
         else:
             self.adinput = inputs
 
     def get_prefix(self):
-        return "tmp" + self.pid_task
+        return self.prefix
 
 class InAtList(GmosaicFile):
     inputs = None
@@ -60,6 +62,11 @@ class InAtList(GmosaicFile):
 
     def prepare(self):
         log.debug("InAtList prepare()")
+        # Filenames are assigned serially so they are deterministic; the
+        # (independent) disk writes, including the @-list, are then done
+        # together
+        self.atlist = "tmpImageList" + self.pid_task
+        ad_files = []
         for ad in self.adinput:
             ad = gemini_tools.obsmode_add(ad)
             origname = ad.filename
@@ -67,24 +74,16 @@ class InAtList(GmosaicFile):
             self.diskinlist.append(ad.filename)
             log.fullinfo("Temporary image (%s) on disk for the IRAF task %s" % \
                           (ad.filename, self.taskname))
-            ad.write(ad.filename, overwrite=True)
+            ad_files.append((ad, ad.filename))
             ad.filename = origname
-        self.atlist = "tmpImageList" + self.pid_task
-        fhdl = open(self.atlist, "w")
-        for fil in self.diskinlist:
-            fhdl.writelines(fil + "\n")
-        fhdl.close()
+        self._write_ads(ad_files, atlist=self.atlist)
         log.fullinfo("Temporary list (%s) on disk for the IRAF task %s" % \
                       (self.atlist, self.taskname))
         self.filedict.update({"inimages": "@" + self.atlist})
 
     def clean(self):
         log.debug("InAtList clean()")
-        for a_file in self.diskinlist:
-            os.remove(a_file)
-            log.fullinfo("%s was deleted from disk" % a_file)
-        os.remove(self.atlist)
-        log.fullinfo("%s was deleted from disk" % self.atlist)
+        self._remove_files(self.diskinlist + [self.atlist])
 
 class OutAtList(GmosaicFile):
     inputs = None
@@ -115,10 +114,7 @@ class OutAtList(GmosaicFile):
             self.diskoutlist.append(self.get_prefix() + ad.filename)
             ad.filename = origname
         self.atlist = "tmpOutList" + self.pid_task
-        fhdl = open(self.atlist, "w")
-        for fil in self.diskoutlist:
-            fhdl.writelines(fil + "\n")
-        fhdl.close()
+        self._write_atlist(self.atlist, self.diskoutlist)
         log.fullinfo("Temporary list (%s) on disk for the IRAF task %s" % \
                       (self.atlist, self.taskname))
         self.filedict.update({"outimages": "@" + self.atlist})
@@ -136,16 +132,13 @@ class OutAtList(GmosaicFile):
 
     def clean(self):
         log.debug("OutAtList clean()")
-        for tmpname in self.diskoutlist:
-            os.remove(tmpname)
-            log.fullinfo(tmpname + " was deleted from disk")
-        os.remove(self.atlist)
-        log.fullinfo(self.atlist + " was deleted from disk")
+        self._remove_files(self.diskoutlist + [self.atlist])
 
 
 class LogFile(GmosaicFile):
     inputs = None
     params = None
+    tmplog_name = None
     def __init__(self, inputs=None, params=None):
         """
         :param rc: Used to store reduction information
@@ -156,6 +149,15 @@ class LogFile(GmosaicFile):
 
     def prepare(self):
         log.debug("LogFile prepare()")
-        tmplog = tempfile.NamedTemporaryFile()
-        self.filedict.update({"logfile": tmplog.name})
+        # The file must still exist when IRAF opens it, so don't use a
+        # NamedTemporaryFile (which is deleted as soon as it is closed)
+        fd, self.tmplog_name = tempfile.mkstemp(prefix=self.taskname + "_",
+                                                suffix=".log")
+        os.close(fd)
+        self.filedict.update({"logfile": self.tmplog_name})
+
+    def clean(self):
+        log.debug("LogFile clean()")
+        if self.tmplog_name:
+            self._remove_files([self.tmplog_name])
 
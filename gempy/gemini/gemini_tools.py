@@ -380,6 +380,10 @@ def clip_auxiliary_data(adinput=None, aux=None, aux_type=None,
         aux_detsec = this_aux.detector_section()
         aux_datasec = this_aux.data_section()
         aux_arraysec = this_aux.array_section()
+        # The binning of each auxiliary extension is needed for every
+        # science extension, so only evaluate the descriptors once
+        aux_binning = [(auxext.detector_x_bin(), auxext.detector_y_bin())
+                       for auxext in this_aux]
 
         for ext, detsec, datasec, arraysec in zip(ad, sci_detsec, sci_datasec,
                                                   sci_arraysec):
@@ -398,10 +402,9 @@ def clip_auxiliary_data(adinput=None, aux=None, aux_type=None,
             science_trimmed = all([off==0 for off in science_offsets])
 
             found = False
-            for auxext, adetsec, adatasec, aarraysec in zip(this_aux,
-                                aux_detsec, aux_datasec, aux_arraysec):
-                if not (auxext.detector_x_bin() == sci_xbin and
-                        auxext.detector_y_bin() == sci_ybin):
+            for auxext, adetsec, adatasec, aarraysec, abinning in zip(this_aux,
+                    aux_detsec, aux_datasec, aux_arraysec, aux_binning):
+                if abinning != (sci_xbin, sci_ybin):
                     continue
 
                 # Array section is unbinned; to use as indices for
@@ -480,10 +483,14 @@ def clip_auxiliary_data(adinput=None, aux=None, aux_type=None,
                 # Convert the dtype if requested (only SCI and VAR)
                 if return_dtype is not None:
                     #ext_to_clip.operate(np.ndarray.astype, return_dtype)
-                    ext_to_clip[0].data = ext_to_clip[0].data.astype(return_dtype)
+                    # The arrays are already a private copy, so only
+                    # convert them if they are not the right type
+                    ext_to_clip[0].data = ext_to_clip[0].data.astype(
+                        return_dtype, copy=False)
                     if ext_to_clip[0].variance is not None:
                         ext_to_clip[0].variance = \
-                            ext_to_clip[0].variance.astype(return_dtype)
+                            ext_to_clip[0].variance.astype(return_dtype,
+                                                           copy=False)
 
                 # Update keywords based on the science frame
                 for descriptor in ('data_section', 'detector_section',
@@ -564,6 +571,14 @@ def clip_auxiliary_data_GSAOI(adinput=None, aux=None, aux_type=None,
         aux_datasec  = this_aux.data_section()
         aux_arraysec = this_aux.array_section()
 
+        # Group the auxiliary extensions by FRAMEID so each science
+        # extension only looks at its candidate matches
+        aux_by_frameid = {}
+        for auxext, adatasec, aarraysec in zip(this_aux, aux_datasec,
+                                               aux_arraysec):
+            aux_by_frameid.setdefault(auxext.hdr['FRAMEID'], []).append(
+                (auxext, adatasec, aarraysec))
+
         for ext, detsec, datasec, arraysec in zip(ad, sci_detsec,
                                             sci_datasec, sci_arraysec):
 
@@ -579,14 +594,10 @@ def clip_auxiliary_data_GSAOI(adinput=None, aux=None, aux_type=None,
 
 
             found = False
-            for auxext, adatasec, aarraysec in zip(this_aux, aux_datasec,
-                                                   aux_arraysec):
-                # Retrieve the extension number for this extension
-                aux_frameid = auxext.hdr['FRAMEID']
+            for auxext, adatasec, aarraysec in aux_by_frameid.get(frameid, []):
                 aux_shape = auxext.data.shape
 
-                if (aux_frameid == frameid and
-                    aux_shape[0] >= science_shape[0] and
+                if (aux_shape[0] >= science_shape[0] and
                     aux_shape[1] >= science_shape[1]):
 
                     # Auxiliary data is big enough as has right FRAMEID
@@ -655,10 +666,14 @@ def clip_auxiliary_data_GSAOI(adinput=None, aux=None, aux_type=None,
                 # Convert the dtype if requested (only SCI and VAR)
                 if return_dtype is not None:
                     #ext_to_clip.operate(np.ndarray.astype, return_dtype)
-                    ext_to_clip[0].data = ext_to_clip[0].data.astype(return_dtype)
+                    # The arrays are already a private copy, so only
+                    # convert them if they are not the right type
+                    ext_to_clip[0].data = ext_to_clip[0].data.astype(
+                        return_dtype, copy=False)
                     if ext_to_clip[0].variance is not None:
                         ext_to_clip[0].variance = \
-                            ext_to_clip[0].variance.astype(return_dtype)
+                            ext_to_clip[0].variance.astype(return_dtype,
+                                                           copy=False)
 
                 # Update keywords based on the science frame
                 for descriptor in ('data_section', 'detector_section',
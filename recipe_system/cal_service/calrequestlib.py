@@ -3,17 +3,19 @@
 #
 #                                                               calrequestlib.py
 # ------------------------------------------------------------------------------
-import hashlib
-
-from os import makedirs
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from os import makedirs, remove, replace, stat
 from os.path import basename, exists
-from os.path import join, split
+from os.path import join
 
 from urllib.parse import urlparse
+from uuid import uuid4
 
 from gempy.utils import logutils
 
 from geminidr import set_caches
+from recipe_system.utils.md5 import md5sum_size_fp
 from recipe_system.cal_service import cal_search_factory, handle_returns_factory
 from .file_getter import get_file_iterator, GetterError
 # ------------------------------------------------------------------------------
@@ -21,28 +23,110 @@ log = logutils.get_logger(__name__)
 # ------------------------------------------------------------------------------
 # Currently delivers transport_request.calibration_search fn.
 calibration_search = cal_search_factory()
+# Maximum number of threads used to check and download calibrations
+MAX_DOWNLOAD_THREADS = 4
+# The pool of download threads is kept for the life of the process, so that
+# each thread's requests session (see file_getter) and its keep-alive
+# connections are reused by every call to process_cal_requests
+_executor = None
 # ------------------------------------------------------------------------------
 def get_request(url, filename):
+    # Download to a temporary file and only move it into place once it is
+    # complete, so a failed download never leaves a truncated file in the
+    # cache. The temporary name is unique, so two processes sharing the
+    # cache can download the same calibration at the same time
     iterator = get_file_iterator(url)
-    with open(filename, 'wb') as fd:
-        for chunk in iterator:
-            fd.write(chunk)
+    tmpname = "{}.{}.part".format(filename, uuid4().hex)
+    try:
+        with open(tmpname, 'xb') as fd:
+            for chunk in iterator:
+                fd.write(chunk)
+        replace(tmpname, filename)
+    except BaseException:
+        iterator.close()
+        if exists(tmpname):
+            remove(tmpname)
+        raise
     return filename
 
 
+@lru_cache(maxsize=256)
+def _md5_digest(filename, size, mtime_ns):
+    # size and mtime_ns are only part of the cache key, so a file that
+    # has been changed is hashed again. Hash in blocks rather than reading
+    # the whole file into memory
+    with open(filename, 'rb') as fobj:
+        return md5sum_size_fp(fobj)[0]
+
+
 def generate_md5_digest(filename):
-    md5 = hashlib.md5()
-    fdata = open(filename, 'rb').read()
-    md5.update(fdata)
-    return md5.hexdigest()
+    # Cached files are checked on every request, so remember the checksum
+    # of each file for as long as its size and modification time are the
+    # same
+    fileinfo = stat(filename)
+    return _md5_digest(filename, fileinfo.st_size, fileinfo.st_mtime_ns)
 
 
-def _check_cache(cname, ctype):
-    cachedir = _makecachedir(ctype)
-    cachename = join(cachedir, cname)
+def _retrieve_calibration(url, md5, calname, records, verify=True):
+    """
+    Downloads a calibration file to the given path in the cache. If verify
+    is True, the md5 checksum of the downloaded file must match the one
+    reported by the calibration service.
+
+    This runs in a worker thread, so log messages are appended to records
+    as (level, message) tuples for the caller to emit in order.
+
+    Returns the path of the file, or None if it could not be retrieved.
+    """
+    try:
+        calname = get_request(url, calname)
+    except GetterError as err:
+        records.extend(('error', message) for message in err.messages)
+        return None
+
+    if verify:
+        # hash compare
+        download_mdf5 = generate_md5_digest(calname)
+        if download_mdf5 == md5:
+            records.append(('status', "MD5 hash match. Download OK."))
+        else:
+            err = "MD5 hash of downloaded file does not match expected hash {}"
+            raise OSError(err.format(md5))
+    return calname
+
+
+def _resolve_calibration(url, md5, cachename, records):
+    """
+    Returns the path of a calibration in the cache, downloading it if it is
+    not cached or if the cached copy does not match the md5 checksum
+    reported by the calibration service. This runs in a worker thread so
+    that hashing cached files overlaps with searches and other downloads;
+    log messages are appended to records, as in _retrieve_calibration.
+
+    Returns None if the file could not be retrieved.
+    """
     if exists(cachename):
-        return cachename, cachedir
-    return None, cachedir
+        if generate_md5_digest(cachename) == md5:
+            records.append(('stdinfo',
+                            "Cached calibration {} matched.".format(cachename)))
+            return cachename
+
+        records.extend([
+            ('stdinfo', "File {} is cached but".format(basename(cachename))),
+            ('stdinfo', "md5 checksums DO NOT MATCH"),
+            ('stdinfo', "Making request on calibration service"),
+            ('stdinfo', "Requesting URL {}".format(url))])
+        return _retrieve_calibration(url, md5, cachename, records, verify=False)
+
+    records.append(('status', "Making request for {}".format(url)))
+    return _retrieve_calibration(url, md5, cachename, records)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_THREADS)
+    return _executor
 
 
 def _makecachedir(caltype):
@@ -57,6 +141,9 @@ class CalibrationRequest:
     Request objects are passed to a calibration_search() function
 
     """
+    __slots__ = ('ad', 'caltype', 'datalabel', 'descriptors', 'filename',
+                 'tags')
+
     def __init__(self, ad, caltype=None):
         self.ad = ad
         self.caltype = caltype
@@ -66,17 +153,12 @@ class CalibrationRequest:
         self.tags = ad.tags
 
     def as_dict(self):
-        retd = {}
-        retd.update(
-            {'filename'   : self.filename,
-             'caltype'    : self.caltype,
-             'datalabel'  : self.datalabel,
-             "descriptors": self.descriptors,
-             "tags"       : self.tags,
-            }
-        )
-
-        return retd
+        return {'filename'   : self.filename,
+                'caltype'    : self.caltype,
+                'datalabel'  : self.datalabel,
+                "descriptors": self.descriptors,
+                "tags"       : self.tags,
+               }
 
     def __str__(self):
         tempStr = "filename: {}\nDescriptors: {}\nTypes: {}"
@@ -108,19 +190,24 @@ def get_cal_requests(inputs, caltype):
 
     _handle_returns = handle_returns_factory()
 
+    # ad.descriptors inspects the whole class, so only do it once per class
+    descriptor_names = {}
+
     rq_events = []
     for ad in inputs:
         log.stdinfo("Received calibration request for {}".format(ad.filename))
         rq = CalibrationRequest(ad, caltype)
+        if ad.__class__ not in descriptor_names:
+            descriptor_names[ad.__class__] = ad.descriptors
         # Check that each descriptor works and returns a sensible value.
         desc_dict = {}
-        for desc_name in ad.descriptors:
+        for desc_name in descriptor_names[ad.__class__]:
             try:
                 descriptor = getattr(ad, desc_name)
             except AttributeError:
                 pass
             else:
-                kwargs = options[desc_name] if desc_name in list(options.keys()) else {}
+                kwargs = options.get(desc_name, {})
                 try:
                     dv = _handle_returns(descriptor(**kwargs))
                 except:
@@ -182,6 +269,14 @@ def process_cal_requests(cal_requests, howmany=None):
         return
 
     cache = set_caches()
+    # Cache checks and downloads are run concurrently while the remaining
+    # requests are searched. Each cached file is only resolved once, even if
+    # several inputs share the same calibration.
+    downloads = {}
+    pending = []
+    # Only look up and create each caltype's cache directory once
+    cachedirs = {}
+    executor = _get_executor()
     for rq in cal_requests:
         calname = None
         calmd5 = None
@@ -203,42 +298,41 @@ def process_cal_requests(cal_requests, howmany=None):
             log.info("Found calibration (url): {}".format(url))
             components = urlparse(url)
             calname = basename(components.path)
-            cachename, cachedir = _check_cache(calname, rq.caltype)
-            if cachename:
-                cached_md5 = generate_md5_digest(cachename)
-                if cached_md5 == md5:
-                    log.stdinfo("Cached calibration {} matched.".format(cachename))
-                    calibs.append(cachename)
-                else:
-                    log.stdinfo("File {} is cached but".format(calname))
-                    log.stdinfo("md5 checksums DO NOT MATCH")
-                    log.stdinfo("Making request on calibration service")
-                    log.stdinfo("Requesting URL {}".format(url))
-                    try:
-                        calname = get_request(url, cachename)
-                        calibs.append(cachename)
-                    except GetterError as err:
-                        for message in err.messages:
-                            log.error(message)
+            if rq.caltype not in cachedirs:
+                cachedirs[rq.caltype] = _makecachedir(rq.caltype)
+            cachename = join(cachedirs[rq.caltype], calname)
+            # Different URLs can map onto the same cached file, which
+            # must not be written by two threads at once. The file can only
+            # be shared if it is expected to have the same checksum
+            if cachename not in downloads:
+                records = []
+                downloads[cachename] = (md5, (
+                    executor.submit(_resolve_calibration, url, md5,
+                                    cachename, records), records))
+            elif downloads[cachename][0] != md5:
+                log.error("Calibration {} would be cached as {}, which is "
+                          "already being retrieved with a different md5 "
+                          "checksum".format(url, cachename))
                 continue
-
-            log.status("Making request for {}".format(url))
-            fname = split(url)[1]
-            calname = join(cachedir, fname)
+            calibs.append(downloads[cachename][1])
+        pending.append((rq, calibs))
+
+    # Wait for the checks and downloads in request order, emitting their
+    # log messages here so they are not interleaved by the worker
+    # threads. Failed retrievals are returned as None. An md5 mismatch
+    # on a download is only raised once all the requests have been
+    # searched and the earlier results have been reported.
+    for rq, calibs in pending:
+        results = []
+        for future, records in calibs:
             try:
-                calname = get_request(url, calname)
-            except GetterError as err:
-                for message in err.messages:
-                    log.error(message)
-            else:
-                # hash compare
-                download_mdf5 = generate_md5_digest(calname)
-                if download_mdf5 == md5:
-                    log.status("MD5 hash match. Download OK.")
-                    calibs.append(calname)
-                else:
-                    err = "MD5 hash of downloaded file does not match expected hash {}"
-                    raise OSError(err.format(md5))
+                results.append(future.result())
+            finally:
+                for level, message in records:
+                    getattr(log, level)(message)
+                # A calibration shared by several inputs is reported once
+                records.clear()
+        calibs = [calib for calib in results if calib]
 
         # If howmany=None, append the only file as a string, instead of the list
         if calibs:
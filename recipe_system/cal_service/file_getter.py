@@ -1,3 +1,5 @@
+import threading
+
 import requests
 from requests.exceptions import HTTPError
 from requests.exceptions import Timeout
@@ -5,15 +7,34 @@ from requests.exceptions import ConnectionError
 
 from gempy.utils import logutils
 
+# A session lets consecutive downloads from the same server reuse the open
+# (keep-alive) connection instead of reconnecting for each file. Sessions
+# are not guaranteed to be thread-safe, so each download thread has its own;
+# calrequestlib keeps its download threads alive, so the sessions persist
+_local = threading.local()
+
+# Size of the blocks in which files are read and yielded
+CHUNK_SIZE = 1000000  # 1 MB
+
 class GetterError(Exception):
     def __init__(self, messages):
         self.messages = messages
 
+def _get_session():
+    try:
+        return _local.session
+    except AttributeError:
+        _local.session = requests.Session()
+        return _local.session
+
 def requests_getter(url):
-    r = requests.get(url, timeout=10.0)
     try:
-        r.raise_for_status()
-        yield from r.iter_content(chunk_size=128)
+        # Stream the body rather than holding the whole file in memory
+        # and close the response so the connection always goes back to the
+        # pool, even if the download fails or is abandoned partway through
+        with _get_session().get(url, timeout=10.0, stream=True) as r:
+            r.raise_for_status()
+            yield from r.iter_content(chunk_size=CHUNK_SIZE)
     except HTTPError as err:
         raise GetterError(["Could not retrieve {}".format(url), str(err)])
     except ConnectionError as err:
@@ -26,7 +47,7 @@ def plain_file_getter(url):
     try:
         with open(path, "rb") as source:
             while True:
-                data = source.read(128)
+                data = source.read(CHUNK_SIZE)
                 if not data:
                     break
                 yield data
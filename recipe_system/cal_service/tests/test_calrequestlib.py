@@ -0,0 +1,233 @@
+"""
+Tests for the `recipe_system.cal_service.calrequestlib` module.
+"""
+
+import hashlib
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from recipe_system.cal_service import calrequestlib
+from recipe_system.cal_service.file_getter import GetterError
+
+
+def test_md5_digest_is_recomputed_when_file_changes(tmpdir):
+    filename = str(tmpdir.join('calibration.fits'))
+
+    with open(filename, 'wb') as fobj:
+        fobj.write(b'first version')
+    first = calrequestlib.generate_md5_digest(filename)
+    assert first == hashlib.md5(b'first version').hexdigest()
+
+    # Different size
+    with open(filename, 'wb') as fobj:
+        fobj.write(b'second, longer version')
+    second = calrequestlib.generate_md5_digest(filename)
+    assert second == hashlib.md5(b'second, longer version').hexdigest()
+
+    # Same size, different modification time
+    with open(filename, 'wb') as fobj:
+        fobj.write(b'third, longer version!')
+    mtime_ns = os.stat(filename).st_mtime_ns + 1000000000
+    os.utime(filename, ns=(mtime_ns, mtime_ns))
+    third = calrequestlib.generate_md5_digest(filename)
+    assert third == hashlib.md5(b'third, longer version!').hexdigest()
+
+
+def test_get_request_moves_complete_download_into_place(tmpdir):
+    source = str(tmpdir.join('source.fits'))
+    filename = str(tmpdir.join('calibration.fits'))
+    with open(source, 'wb') as fobj:
+        fobj.write(b'calibration data')
+
+    assert calrequestlib.get_request('file://' + source, filename) == filename
+    with open(filename, 'rb') as fobj:
+        assert fobj.read() == b'calibration data'
+    # No temporary file is left behind
+    assert sorted(os.listdir(str(tmpdir))) == ['calibration.fits', 'source.fits']
+
+
+def test_get_request_removes_partial_download(tmpdir, monkeypatch):
+    filename = str(tmpdir.join('calibration.fits'))
+
+    def failing_iterator(url):
+        yield b'partial data'
+        raise GetterError(["Connection lost"])
+
+    monkeypatch.setattr(calrequestlib, 'get_file_iterator', failing_iterator)
+    with pytest.raises(GetterError):
+        calrequestlib.get_request('file:///unused', filename)
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_get_request_leaves_nothing_for_missing_file(tmpdir):
+    source = str(tmpdir.join('missing.fits'))
+    filename = str(tmpdir.join('calibration.fits'))
+
+    with pytest.raises(GetterError):
+        calrequestlib.get_request('file://' + source, filename)
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_get_request_downloads_do_not_share_temporary_file(tmpdir, monkeypatch):
+    filename = str(tmpdir.join('calibration.fits'))
+
+    # Start a second download of the same file while the first one is
+    # still being written
+    def interleaved_iterator(url):
+        yield b'first '
+        if url == 'file:///first':
+            calrequestlib.get_request('file:///second', filename)
+        yield b'download'
+
+    monkeypatch.setattr(calrequestlib, 'get_file_iterator',
+                        interleaved_iterator)
+    calrequestlib.get_request('file:///first', filename)
+
+    with open(filename, 'rb') as fobj:
+        assert fobj.read() == b'first download'
+    assert os.listdir(str(tmpdir)) == ['calibration.fits']
+
+
+# Tests for process_cal_requests, with the calibration search and the
+# downloads replaced so that no calibration service is needed
+CALDATA = b'calibration data'
+CALMD5 = hashlib.md5(CALDATA).hexdigest()
+
+
+@pytest.fixture
+def calcache(tmpdir, monkeypatch):
+    monkeypatch.setattr(calrequestlib, 'set_caches',
+                        lambda: {'calibrations': str(tmpdir)})
+    return tmpdir
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    urls = []
+
+    def get_file_iterator(url):
+        urls.append(url)
+        yield CALDATA
+
+    monkeypatch.setattr(calrequestlib, 'get_file_iterator', get_file_iterator)
+    return urls
+
+
+def set_search_results(monkeypatch, results):
+    def calibration_search(rq, howmany=1):
+        return results[rq.filename]
+
+    monkeypatch.setattr(calrequestlib, 'calibration_search', calibration_search)
+
+
+def make_request(filename, caltype='processed_bias'):
+    return SimpleNamespace(ad=filename, caltype=caltype, filename=filename)
+
+
+def test_process_cal_requests_downloads_missing_calibration(
+        calcache, downloads, monkeypatch):
+    url = 'https://archive.gemini.edu/file/bias.fits'
+    set_search_results(monkeypatch, {'sci.fits': ([url], [CALMD5])})
+
+    records = calrequestlib.process_cal_requests([make_request('sci.fits')])
+
+    cachename = str(calcache.join('processed_bias', 'bias.fits'))
+    assert records == {'sci.fits': cachename}
+    assert downloads == [url]
+    with open(cachename, 'rb') as fobj:
+        assert fobj.read() == CALDATA
+
+
+def test_process_cal_requests_uses_matching_cached_calibration(
+        calcache, downloads, monkeypatch):
+    url = 'https://archive.gemini.edu/file/bias.fits'
+    set_search_results(monkeypatch, {'sci.fits': ([url], [CALMD5])})
+    cachename = str(calcache.mkdir('processed_bias').join('bias.fits'))
+    with open(cachename, 'wb') as fobj:
+        fobj.write(CALDATA)
+
+    records = calrequestlib.process_cal_requests([make_request('sci.fits')])
+
+    assert records == {'sci.fits': cachename}
+    assert downloads == []
+
+
+def test_process_cal_requests_replaces_mismatched_cached_calibration(
+        calcache, downloads, monkeypatch):
+    url = 'https://archive.gemini.edu/file/bias.fits'
+    set_search_results(monkeypatch, {'sci.fits': ([url], [CALMD5])})
+    cachename = str(calcache.mkdir('processed_bias').join('bias.fits'))
+    with open(cachename, 'wb') as fobj:
+        fobj.write(b'stale data')
+
+    records = calrequestlib.process_cal_requests([make_request('sci.fits')])
+
+    assert records == {'sci.fits': cachename}
+    assert downloads == [url]
+    with open(cachename, 'rb') as fobj:
+        assert fobj.read() == CALDATA
+
+
+def test_process_cal_requests_downloads_shared_calibration_once(
+        calcache, downloads, monkeypatch):
+    url = 'https://archive.gemini.edu/file/bias.fits'
+    set_search_results(monkeypatch, {'sci1.fits': ([url], [CALMD5]),
+                                     'sci2.fits': ([url], [CALMD5])})
+
+    records = calrequestlib.process_cal_requests(
+        [make_request('sci1.fits'), make_request('sci2.fits')])
+
+    cachename = str(calcache.join('processed_bias', 'bias.fits'))
+    assert records == {'sci1.fits': cachename, 'sci2.fits': cachename}
+    assert downloads == [url]
+
+
+def test_process_cal_requests_caches_shared_url_per_caltype(
+        calcache, downloads, monkeypatch):
+    url = 'https://archive.gemini.edu/file/cal.fits'
+    set_search_results(monkeypatch, {'sci1.fits': ([url], [CALMD5]),
+                                     'sci2.fits': ([url], [CALMD5])})
+
+    records = calrequestlib.process_cal_requests(
+        [make_request('sci1.fits', 'processed_bias'),
+         make_request('sci2.fits', 'processed_flat')])
+
+    assert records == {
+        'sci1.fits': str(calcache.join('processed_bias', 'cal.fits')),
+        'sci2.fits': str(calcache.join('processed_flat', 'cal.fits'))}
+    assert downloads == [url, url]
+    for cachename in records.values():
+        assert os.path.exists(cachename)
+
+
+def test_process_cal_requests_resolves_each_cached_file_once(
+        calcache, downloads, monkeypatch):
+    url1 = 'https://archive.gemini.edu/file/bias.fits?version=1'
+    url2 = 'https://archive.gemini.edu/file/bias.fits?version=2'
+    set_search_results(monkeypatch, {'sci1.fits': ([url1], [CALMD5]),
+                                     'sci2.fits': ([url2], [CALMD5])})
+
+    records = calrequestlib.process_cal_requests(
+        [make_request('sci1.fits'), make_request('sci2.fits')])
+
+    cachename = str(calcache.join('processed_bias', 'bias.fits'))
+    assert records == {'sci1.fits': cachename, 'sci2.fits': cachename}
+    assert downloads == [url1]
+
+
+def test_process_cal_requests_does_not_share_cached_file_with_other_md5(
+        calcache, downloads, monkeypatch):
+    url1 = 'https://archive.gemini.edu/file/bias.fits?version=1'
+    url2 = 'https://archive.gemini.edu/file/bias.fits?version=2'
+    othermd5 = hashlib.md5(b'other calibration data').hexdigest()
+    set_search_results(monkeypatch, {'sci1.fits': ([url1], [CALMD5]),
+                                     'sci2.fits': ([url2], [othermd5])})
+
+    records = calrequestlib.process_cal_requests(
+        [make_request('sci1.fits'), make_request('sci2.fits')])
+
+    cachename = str(calcache.join('processed_bias', 'bias.fits'))
+    assert records == {'sci1.fits': cachename}
+    assert downloads == [url1]